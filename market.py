@@ -1,161 +1,322 @@
-import datetime
+import asyncio
+import json
 import logging.config
+import time
 from environs import Env
 from seller import download_stock
 
-import requests
+import aiohttp
+import orjson
+import pandas as pd
+from aiolimiter import AsyncLimiter
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
-from seller import divide, price_conversion
+from seller import _index_remnants, divide, price_conversion
 
 logger = logging.getLogger(__file__)
 
+# Держим частоту запросов чуть ниже квоты API, чтобы не ловить 429:
+LIMIT = AsyncLimiter(10, 1)
+SEM = asyncio.Semaphore(20)
 
-def get_product_list(page, campaign_id, access_token):
+# С какого размера остатков векторизация в pandas окупает создание DataFrame:
+VECTORIZE_MIN_ROWS = 1000
+
+# Документированный максимум limit для offer-mapping-entries — 200 записей:
+PAGE_LIMIT = 200
+
+# Список офферов кампании меняется редко, держим его на диске один час:
+OFFER_IDS_CACHE_FILE = "offer_ids_cache.json"
+OFFER_IDS_CACHE_TTL = 3600
+
+
+def _load_cached_offer_ids(campaign_id):
+    """Loads the cached offer IDs of a campaign from disk if they are still fresh.
+
+    Args:
+        campaign_id (str): The ID of the campaign whose cache entry to look up.
+
+    Returns:
+        list: The cached offer IDs, or None when there is no entry for the
+            campaign, the entry is older than `OFFER_IDS_CACHE_TTL` seconds,
+            or the cache file is missing or unreadable.
+    """
+    try:
+        with open(OFFER_IDS_CACHE_FILE) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    entry = cache.get(str(campaign_id))
+    if not entry:
+        return None
+    if time.time() - entry.get("saved_at", 0) > OFFER_IDS_CACHE_TTL:
+        return None
+    return entry.get("offer_ids")
+
+
+def _store_cached_offer_ids(campaign_id, offer_ids):
+    """Stores the offer IDs of a campaign in the on-disk cache with a timestamp.
+
+    Args:
+        campaign_id (str): The ID of the campaign the offer IDs belong to.
+        offer_ids (list): The offer IDs to cache.
+    """
+    try:
+        with open(OFFER_IDS_CACHE_FILE) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        cache = {}
+    cache[str(campaign_id)] = {"saved_at": time.time(), "offer_ids": offer_ids}
+    with open(OFFER_IDS_CACHE_FILE, "w") as cache_file:
+        json.dump(cache, cache_file)
+
+
+async def _throttle(response):
+    """Pauses before the next request when the API rate-limit quota is nearly exhausted.
+
+    Inspects the `X-RateLimit-Remaining` response header and, if only a couple
+    of requests are left in the current window, sleeps for a second so the
+    concurrent tasks do not burn through the remaining quota and trigger 429s.
+
+    Args:
+        response (aiohttp.ClientResponse): The response whose rate-limit headers to inspect.
+    """
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining is not None and int(remaining) <= 2:
+        await asyncio.sleep(1)
+
+
+def _is_transient_error(error):
+    """Tells whether a request failure is worth retrying.
+
+    Only 429, 5xx and timeouts are transient; other 4xx responses (bad
+    payload, revoked token) will fail identically on every attempt and
+    should surface immediately instead of burning the retry budget.
+
+    Args:
+        error (BaseException): The exception raised by the request attempt.
+
+    Returns:
+        bool: True if the request should be retried.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, asyncio.TimeoutError)
+
+
+async def _request(session, method, url, **kwargs):
+    """Sends a rate-limited request to the Yandex.Market API with exponential-backoff retries.
+
+    Transient failures (429, 5xx, timeouts) no longer abort a whole upload
+    scan: the request is retried up to six times with jittered exponential
+    back-off, honoring the `Retry-After` header when the API asks to slow
+    down. All three HTTP wrappers go through this helper so the limiter,
+    throttling and retry policy stay in one place.
+
+    Args:
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
+        method (str): The HTTP method of the request, e.g. "GET" or "PUT".
+        url (str): The full URL of the API endpoint.
+        **kwargs: Extra arguments passed to `session.request`, such as `params` or `json`.
+
+    Returns:
+        dict: The decoded JSON body of the successful response.
+
+    Raises:
+        aiohttp.ClientResponseError: If the request still fails after all retry attempts.
+    """
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(6),
+        wait=wait_exponential_jitter(1, 30),
+        retry=retry_if_exception(_is_transient_error),
+        reraise=True,
+    ):
+        with attempt:
+            async with SEM, LIMIT:
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status == 429:
+                        await asyncio.sleep(
+                            int(response.headers.get("Retry-After", "1"))
+                        )
+                    response.raise_for_status()
+                    await _throttle(response)
+                    return await response.json(loads=orjson.loads)
+
+
+def _session(access_token):
+    """Creates a shared aiohttp client session for the Yandex.Market API.
+
+    The session keeps a pool of keep-alive connections to the API host, so
+    concurrent requests reuse already established TCP+TLS connections instead
+    of paying a full handshake per call. The authorization headers are set
+    once on the session and apply to every request made through it.
+
+    Args:
+        access_token (str): The OAuth2 access token for authenticating the API requests.
+
+    Returns:
+        aiohttp.ClientSession: A session configured for the Yandex.Market API.
+
+    Example of correct usage:
+        async with _session("your_access_token") as session:
+            product_list = await get_product_list("", "123456", session)
+    """
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=64, keepalive_timeout=75)
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json",
+        "Host": "api.partner.market.yandex.ru",
+    }
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    )
+
+
+async def get_product_list(page, campaign_id, session):
     """Fetches a list of product offer mapping entries from Yandex.Market API.
 
-    This function retrieves a paginated list of product offers associated with a specific campaign
-    using the provided access token for authorization.
+    This coroutine retrieves a paginated list of product offers associated with a specific campaign
+    using the shared client session for authorization and connection pooling.
 
     Args:
         page (str): The token for the page of results to retrieve.
         campaign_id (str): The ID of the campaign to fetch offers for.
-        access_token (str): The OAuth2 access token for authenticating the API request.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         list: A list of product offer mapping entries if the request is successful.
 
     Example of correct usage:
-        product_list = get_product_list("page_token_example", "123456", "your_access_token")
+        product_list = await get_product_list("page_token_example", "123456", session)
 
     Example of incorrect usage:
-        product_list = get_product_list("invalid_page_token", "invalid_campaign_id", "invalid_access_token")
-        # This will raise an HTTPError if the request fails due to invalid parameters.
+        product_list = await get_product_list("invalid_page_token", "invalid_campaign_id", session)
+        # This will raise a ClientResponseError if the request fails due to invalid parameters.
     """
     endpoint_url = "https://api.partner.market.yandex.ru/"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Host": "api.partner.market.yandex.ru",
-    }
     payload = {
         "page_token": page,
-        "limit": 200,
+        "limit": PAGE_LIMIT,
     }
     url = endpoint_url + f"campaigns/{campaign_id}/offer-mapping-entries"
-    response = requests.get(url, headers=headers, params=payload)
-    response.raise_for_status()
-    response_object = response.json()
+    response_object = await _request(session, "GET", url, params=payload)
     return response_object.get("result")
 
 
-def update_stocks(stocks, campaign_id, access_token):
+async def update_stocks(stocks, campaign_id, session):
     """
     Updates the stock information for the specified products in the Yandex Market API.
 
-    This function sends a PUT request to the Yandex Market API to update the stock levels
+    This coroutine sends a PUT request to the Yandex Market API to update the stock levels
     for the given list of stock keeping units (SKUs) associated with a specific campaign.
 
     Args:
         stocks (list): A list of stock keeping units (SKUs) to be updated.
         campaign_id (str): The ID of the campaign for which the stocks are being updated.
-        access_token (str): The access token used for authentication with the Yandex Market API.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         dict: A JSON response object containing the result of the stock update operation.
 
     Example of correct usage:
-        response = update_stocks(['sku1', 'sku2', 'sku3'], 'campaign_123', 'your_access_token')
+        response = await update_stocks(['sku1', 'sku2', 'sku3'], 'campaign_123', session)
 
     Example of incorrect usage:
-        response = update_stocks([], 'invalid_campaign_id', 'invalid_token')
+        response = await update_stocks([], 'invalid_campaign_id', session)
         # This will raise an error as an empty list of stocks cannot be processed.
     """
     endpoint_url = "https://api.partner.market.yandex.ru/"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Host": "api.partner.market.yandex.ru",
-    }
     payload = {"skus": stocks}
     url = endpoint_url + f"campaigns/{campaign_id}/offers/stocks"
-    response = requests.put(url, headers=headers, json=payload)
-    response.raise_for_status()
-    response_object = response.json()
+    response_object = await _request(session, "PUT", url, json=payload)
     return response_object
 
 
-def update_price(prices, campaign_id, access_token):
+async def update_price(prices, campaign_id, session):
     """
     Updates the stock levels of products in Yandex.Market API.
 
-    This function sends a request to update the stock levels for a list of products
-    associated with a specific campaign using the provided access token for authorization.
+    This coroutine sends a request to update the stock levels for a list of products
+    associated with a specific campaign using the shared client session for authorization.
 
     Args:
-        stocks (list): A list of stock keeping units (SKUs) with their updated stock levels.
+        prices (list): A list of stock keeping units (SKUs) with their updated stock levels.
         campaign_id (str): The ID of the campaign to update stocks for.
-        access_token (str): The OAuth2 access token for authenticating the API request.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         dict: A response object containing the result of the stock update request if successful.
 
     Example of correct usage:
-        response = update_stocks([{"sku": "sku_example_1", "stock": 10}, {"sku": "sku_example_2", "stock": 5}], "123456", "your_access_token")
+        response = await update_price([{"sku": "sku_example_1", "stock": 10}, {"sku": "sku_example_2", "stock": 5}], "123456", session)
 
     Example of incorrect usage:
-        response = update_stocks([{"sku": "invalid_sku", "stock": -1}], "invalid_campaign_id", "invalid_access_token")
-        # This will raise an HTTPError if the request fails due to invalid parameters.
+        response = await update_price([{"sku": "invalid_sku", "stock": -1}], "invalid_campaign_id", session)
+        # This will raise a ClientResponseError if the request fails due to invalid parameters.
     """
     endpoint_url = "https://api.partner.market.yandex.ru/"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Host": "api.partner.market.yandex.ru",
-    }
     payload = {"offers": prices}
     url = endpoint_url + f"campaigns/{campaign_id}/offer-prices/updates"
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    response_object = response.json()
+    response_object = await _request(session, "POST", url, json=payload)
     return response_object
 
 
-def get_offer_ids(campaign_id, market_token):
+async def get_offer_ids(campaign_id, session):
     """
     Retrieves the offer IDs of products from Yandex.Market API.
 
-    This function fetches all product offer mapping entries associated with a specific campaign
-    using the provided market token for authorization. It handles pagination to ensure all offers
-    are retrieved.
+    This coroutine fetches all product offer mapping entries associated with a specific campaign
+    using the shared client session for authorization. It handles pagination to ensure all offers
+    are retrieved. The result is cached on disk for `OFFER_IDS_CACHE_TTL` seconds, so repeated
+    runs within that window skip the paginated scan entirely.
 
     Args:
         campaign_id (str): The ID of the campaign to fetch offer IDs for.
-        market_token (str): The OAuth2 access token for authenticating the API request.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         list: A list of offer IDs (shop SKUs) for the products associated with the specified campaign.
 
     Example of correct usage:
-        offer_ids = get_offer_ids("123456", "your_market_token")
+        offer_ids = await get_offer_ids("123456", session)
 
     Example of incorrect usage:
-        offer_ids = get_offer_ids("invalid_campaign_id", "invalid_market_token")
-        # This will raise an HTTPError if the request fails due to invalid parameters.
+        offer_ids = await get_offer_ids("invalid_campaign_id", session)
+        # This will raise a ClientResponseError if the request fails due to invalid parameters.
     """
-    page = ""
-    product_list = []
-    while True:
-        some_prod = get_product_list(page, campaign_id, market_token)
-        product_list.extend(some_prod.get("offerMappingEntries"))
-        page = some_prod.get("paging").get("nextPageToken")
-        if not page:
-            break
+    cached = _load_cached_offer_ids(campaign_id)
+    if cached is not None:
+        return cached
     offer_ids = []
-    for product in product_list:
-        offer_ids.append(product.get("offer").get("shopSku"))
+    next_page = asyncio.ensure_future(get_product_list("", campaign_id, session))
+    while next_page is not None:
+        some_prod = await next_page
+        # Токен следующей страницы известен сразу, поэтому запрашиваем ее
+        # в фоне, пока разбираем текущую:
+        page = some_prod.get("paging").get("nextPageToken")
+        if page:
+            next_page = asyncio.ensure_future(
+                get_product_list(page, campaign_id, session)
+            )
+            # Нулевой sleep отдает управление циклу событий: без него
+            # фоновая задача не стартует до следующего await:
+            await asyncio.sleep(0)
+        else:
+            next_page = None
+        # Сразу достаем SKU из страницы, не накапливая полные записи:
+        offer_ids.extend(
+            product.get("offer").get("shopSku")
+            for product in some_prod.get("offerMappingEntries")
+        )
+    _store_cached_offer_ids(campaign_id, offer_ids)
     return offer_ids
 
 
@@ -185,21 +346,26 @@ def create_stocks(watch_remnants, offer_ids, warehouse_id):
         stocks = create_stocks([], [], "invalid_warehouse_id")
         # This will return an empty list as there are no watch remnants or offer IDs to process.
     """
+    if len(watch_remnants) >= VECTORIZE_MIN_ROWS:
+        return _create_stocks_frame(watch_remnants, offer_ids, warehouse_id)
     # Уберем то, что не загружено в market
     stocks = list()
-    date = str(datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z")
-    for watch in watch_remnants:
-        if str(watch.get("Код")) in offer_ids:
+    # Множество дает O(1) проверку и удаление вместо O(n) по списку,
+    # а копирование не дает расходовать список вызывающей стороны:
+    offer_ids = set(offer_ids)
+    date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    for code, watch in _index_remnants(watch_remnants).items():
+        if code in offer_ids:
             count = str(watch.get("Количество"))
             if count == ">10":
                 stock = 100
             elif count == "1":
                 stock = 0
             else:
-                stock = int(watch.get("Количество"))
+                stock = int(count)
             stocks.append(
                 {
-                    "sku": str(watch.get("Код")),
+                    "sku": code,
                     "warehouseId": warehouse_id,
                     "items": [
                         {
@@ -210,7 +376,7 @@ def create_stocks(watch_remnants, offer_ids, warehouse_id):
                     ],
                 }
             )
-            offer_ids.remove(str(watch.get("Код")))
+            offer_ids.remove(code)
     # Добавим недостающее из загруженного:
     for offer_id in offer_ids:
         stocks.append(
@@ -229,6 +395,63 @@ def create_stocks(watch_remnants, offer_ids, warehouse_id):
     return stocks
 
 
+def _create_stocks_frame(watch_remnants, offer_ids, warehouse_id):
+    """Vectorized pandas variant of `create_stocks` for large remnant lists.
+
+    Builds a DataFrame over the two columns the loop actually reads, filters
+    the rows down to the offer IDs known to the market, and converts the
+    quantity column in bulk instead of row by row. Produces the same entries
+    as the plain-Python path, including zero stocks for offer IDs without a
+    matching remnant.
+
+    Args:
+        watch_remnants (list): A list of dictionaries containing product information.
+        offer_ids (list): A list of offer IDs (product codes) that are currently available in the market.
+        warehouse_id (str): The ID of the warehouse where the stock is held.
+
+    Returns:
+        list: A list of stock entries formatted for the API.
+    """
+    offer_ids = set(offer_ids)
+    date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    frame = pd.DataFrame(watch_remnants, columns=["Код", "Количество"])
+    frame["Код"] = frame["Код"].astype(str)
+    frame = frame[frame["Код"].isin(offer_ids)].drop_duplicates(subset="Код")
+    counts = (
+        frame["Количество"].astype(str).replace({">10": "100", "1": "0"}).astype(int)
+    )
+    stocks = [
+        {
+            "sku": code,
+            "warehouseId": warehouse_id,
+            "items": [
+                {
+                    "count": int(count),
+                    "type": "FIT",
+                    "updatedAt": date,
+                }
+            ],
+        }
+        for code, count in zip(frame["Код"], counts)
+    ]
+    # Добавим недостающее из загруженного:
+    for offer_id in offer_ids.difference(frame["Код"]):
+        stocks.append(
+            {
+                "sku": offer_id,
+                "warehouseId": warehouse_id,
+                "items": [
+                    {
+                        "count": 0,
+                        "type": "FIT",
+                        "updatedAt": date,
+                    }
+                ],
+            }
+        )
+    return stocks
+
+
 def create_prices(watch_remnants, offer_ids):
     """
     Creates a list of price entries for products based on the provided watch remnants and offer IDs.
@@ -252,72 +475,153 @@ def create_prices(watch_remnants, offer_ids):
         prices = create_prices([], [])
         # This will return an empty list as there are no watch remnants or offer IDs to process.
     """
+    if len(watch_remnants) >= VECTORIZE_MIN_ROWS:
+        return _create_prices_frame(watch_remnants, offer_ids)
+    # Множество дает O(1) проверку принадлежности вместо O(n) по списку:
+    offer_ids = set(offer_ids)
     prices = []
-    for watch in watch_remnants:
-        if str(watch.get("Код")) in offer_ids:
-            price = {
-                "id": str(watch.get("Код")),
-                # "feed": {"id": 0},
-                "price": {
-                    "value": int(price_conversion(watch.get("Цена"))),
-                    # "discountBase": 0,
-                    "currencyId": "RUR",
-                    # "vat": 0,
-                },
-                # "marketSku": 0,
-                # "shopSku": "string",
-            }
+    for code, watch in _index_remnants(watch_remnants).items():
+        if code in offer_ids:
+            price = _price_entry(code, watch.get("Цена"))
             prices.append(price)
     return prices
 
 
-async def upload_prices(watch_remnants, campaign_id, market_token):
+# Готовые записи цен, переиспользуемые между повторными вызовами create_prices:
+_price_entry_cache = {}
+
+
+def _price_entry(code, raw_price):
+    """Builds (or reuses) the API price entry for one product code.
+
+    Re-runs within a process mostly see the same codes and price strings —
+    e.g. prices for the DBS campaign right after FBS, or a retried subset —
+    so the finished entries are memoized by (code, raw price). Cached entries
+    are shared and must be treated as immutable by callers.
+
+    Args:
+        code (str): The stringified product code.
+        raw_price (str): The raw price string from the remnants file.
+
+    Returns:
+        dict: A price entry formatted for the API.
     """
-    Uploads price entries for products based on the provided watch remnants, campaign ID, and market token.
+    entry = _price_entry_cache.get((code, raw_price))
+    if entry is None:
+        entry = {
+            "id": code,
+            # "feed": {"id": 0},
+            "price": {
+                "value": int(price_conversion(raw_price)),
+                # "discountBase": 0,
+                "currencyId": "RUR",
+                # "vat": 0,
+            },
+            # "marketSku": 0,
+            # "shopSku": "string",
+        }
+        _price_entry_cache[(code, raw_price)] = entry
+    return entry
+
+
+def _create_prices_frame(watch_remnants, offer_ids):
+    """Vectorized pandas variant of `create_prices` for large remnant lists.
+
+    Filters the remnants down to the offer IDs known to the market and applies
+    the price normalization from `price_conversion` as bulk string operations
+    on the whole column instead of converting row by row.
 
-    This asynchronous function retrieves the offer IDs associated with the specified campaign and
-    generates price information for products available in the market using the `create_prices` function.
-    It then divides the price entries into batches of 500 and updates the prices in the market using
-    the `update_price` function for each batch.
+    Args:
+        watch_remnants (list): A list of dictionaries containing product information.
+        offer_ids (list): A list of offer IDs (product codes) that are currently available in the market.
+
+    Returns:
+        list: A list of price entries formatted for the API.
+    """
+    offer_ids = set(offer_ids)
+    frame = pd.DataFrame(watch_remnants, columns=["Код", "Цена"])
+    frame["Код"] = frame["Код"].astype(str)
+    frame = frame[frame["Код"].isin(offer_ids)].drop_duplicates(subset="Код")
+    values = (
+        frame["Цена"]
+        .astype(str)
+        .str.split(".")
+        .str[0]
+        .str.replace("[^0-9]", "", regex=True)
+        .astype(int)
+    )
+    return [
+        {
+            "id": code,
+            "price": {
+                "value": int(value),
+                "currencyId": "RUR",
+            },
+        }
+        for code, value in zip(frame["Код"], values)
+    ]
+
+
+async def upload_prices(watch_remnants, campaign_id, session, offer_ids=None):
+    """
+    Uploads price entries for products based on the provided watch remnants, campaign ID, and client session.
+
+    This asynchronous function generates price information for products available in the market
+    using the `create_prices` function. The offer IDs associated with the campaign can be passed
+    in by the caller to avoid repeating the paginated offer scan; when omitted they are fetched here.
+    It then divides the price entries into batches of 500 and updates the prices in the market
+    concurrently with the `update_price` coroutine, so all batches are in flight at the same time
+    over the pooled connections of the shared session.
 
     Args:
         watch_remnants (list): A list of dictionaries containing product information, including
                                 product codes and prices.
         campaign_id (str): The ID of the campaign for which the prices are being uploaded.
-        market_token (str): The token used for authentication with the market API.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
+        offer_ids (list, optional): The offer IDs already fetched for this campaign.
+            Defaults to None, in which case they are fetched via `get_offer_ids`.
 
     Returns:
         list: A list of price entries that were uploaded, formatted for the API.
 
     Example of correct usage:
-        uploaded_prices = await upload_prices(watch_remnants_data, "campaign_123", "market_token_abc")
+        uploaded_prices = await upload_prices(watch_remnants_data, "campaign_123", session)
 
     Example of incorrect usage:
-        uploaded_prices = await upload_prices([], "invalid_campaign_id", "invalid_token")
+        uploaded_prices = await upload_prices([], "invalid_campaign_id", session)
         # This will return an empty list as there are no watch remnants to process.
     """
-    offer_ids = get_offer_ids(campaign_id, market_token)
+    if offer_ids is None:
+        offer_ids = await get_offer_ids(campaign_id, session)
     prices = create_prices(watch_remnants, offer_ids)
-    for some_prices in list(divide(prices, 500)):
-        update_price(some_prices, campaign_id, market_token)
+    await asyncio.gather(
+        *(
+            update_price(some_prices, campaign_id, session)
+            for some_prices in divide(prices, 500)
+        )
+    )
     return prices
 
 
-async def upload_stocks(watch_remnants, campaign_id, market_token, warehouse_id):
+async def upload_stocks(watch_remnants, campaign_id, session, warehouse_id, offer_ids=None):
     """
-    Uploads stock entries for products based on the provided watch remnants, campaign ID, market token, and warehouse ID.
-
-    This asynchronous function retrieves the offer IDs associated with the specified campaign and generates stock
-    information for products available in the market using the `create_stocks` function. It then divides the stock
-    entries into batches of 2000 and updates the stocks in the market using the `update_stocks` function for each
-    batch. Finally, it filters out the stocks that have a count of zero and returns both the non-empty stocks and
+    Uploads stock entries for products based on the provided watch remnants, campaign ID, client session, and warehouse ID.
+
+    This asynchronous function generates stock information for products available in the market using the
+    `create_stocks` function. The offer IDs associated with the campaign can be passed in by the caller to
+    avoid repeating the paginated offer scan; when omitted they are fetched here. It then divides the stock
+    entries into batches of 2000 and updates the stocks in the market concurrently with the `update_stocks`
+    coroutine, so all batches are in flight at the same time over the pooled connections of the shared session.
+    Finally, it filters out the stocks that have a count of zero and returns both the non-empty stocks and
     the complete list of stocks.
 
     Args:
         watch_remnants (list): A list of dictionaries containing product information, including product codes.
         campaign_id (str): The ID of the campaign for which the stocks are being uploaded.
-        market_token (str): The token used for authentication with the market API.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
         warehouse_id (str): The ID of the warehouse where the stocks are located.
+        offer_ids (list, optional): The offer IDs already fetched for this campaign.
+            Defaults to None, in which case they are fetched via `get_offer_ids`.
 
     Returns:
         tuple: A tuple containing:
@@ -325,23 +629,28 @@ async def upload_stocks(watch_remnants, campaign_id, market_token, warehouse_id)
             - list: A complete list of stock entries that were created.
 
     Example of correct usage:
-        non_empty_stocks, all_stocks = await upload_stocks(watch_remnants_data, "campaign_123", "market_token_abc", "warehouse_456")
+        non_empty_stocks, all_stocks = await upload_stocks(watch_remnants_data, "campaign_123", session, "warehouse_456")
 
     Example of incorrect usage:
-        non_empty_stocks, all_stocks = await upload_stocks([], "invalid_campaign_id", "invalid_token", "invalid_warehouse_id")
+        non_empty_stocks, all_stocks = await upload_stocks([], "invalid_campaign_id", session, "invalid_warehouse_id")
         # This will return empty lists as there are no watch remnants to process.
     """
-    offer_ids = get_offer_ids(campaign_id, market_token)
+    if offer_ids is None:
+        offer_ids = await get_offer_ids(campaign_id, session)
     stocks = create_stocks(watch_remnants, offer_ids, warehouse_id)
-    for some_stock in list(divide(stocks, 2000)):
-        update_stocks(some_stock, campaign_id, market_token)
-    not_empty = list(
-        filter(lambda stock: (stock.get("items")[0].get("count") != 0), stocks)
+    await asyncio.gather(
+        *(
+            update_stocks(some_stock, campaign_id, session)
+            for some_stock in divide(stocks, 2000)
+        )
     )
+    not_empty = [
+        stock for stock in stocks if stock.get("items")[0].get("count") != 0
+    ]
     return not_empty, stocks
 
 
-def main():
+async def main():
     env = Env()
     market_token = env.str("MARKET_TOKEN")
     campaign_fbs_id = env.str("FBS_ID")
@@ -351,30 +660,44 @@ def main():
 
     watch_remnants = download_stock()
     try:
-        # FBS
-        offer_ids = get_offer_ids(campaign_fbs_id, market_token)
-        # Обновить остатки FBS
-        stocks = create_stocks(watch_remnants, offer_ids, warehouse_fbs_id)
-        for some_stock in list(divide(stocks, 2000)):
-            update_stocks(some_stock, campaign_fbs_id, market_token)
-        # Поменять цены FBS
-        upload_prices(watch_remnants, campaign_fbs_id, market_token)
-
-        # DBS
-        offer_ids = get_offer_ids(campaign_dbs_id, market_token)
-        # Обновить остатки DBS
-        stocks = create_stocks(watch_remnants, offer_ids, warehouse_dbs_id)
-        for some_stock in list(divide(stocks, 2000)):
-            update_stocks(some_stock, campaign_dbs_id, market_token)
-        # Поменять цены DBS
-        upload_prices(watch_remnants, campaign_dbs_id, market_token)
-    except requests.exceptions.ReadTimeout:
+        async with _session(market_token) as session:
+            # Один пагинированный скан офферов на кампанию вместо двух:
+            fbs_offer_ids, dbs_offer_ids = await asyncio.gather(
+                get_offer_ids(campaign_fbs_id, session),
+                get_offer_ids(campaign_dbs_id, session),
+            )
+            # FBS и DBS не разделяют состояние (разные campaign_id и
+            # warehouse_id), поэтому все четыре загрузки идут параллельно:
+            tasks = [
+                # Обновить остатки FBS
+                upload_stocks(
+                    watch_remnants,
+                    campaign_fbs_id,
+                    session,
+                    warehouse_fbs_id,
+                    fbs_offer_ids,
+                ),
+                # Поменять цены FBS
+                upload_prices(watch_remnants, campaign_fbs_id, session, fbs_offer_ids),
+                # Обновить остатки DBS
+                upload_stocks(
+                    watch_remnants,
+                    campaign_dbs_id,
+                    session,
+                    warehouse_dbs_id,
+                    dbs_offer_ids,
+                ),
+                # Поменять цены DBS
+                upload_prices(watch_remnants, campaign_dbs_id, session, dbs_offer_ids),
+            ]
+            await asyncio.gather(*tasks)
+    except asyncio.TimeoutError:
         print("Превышено время ожидания...")
-    except requests.exceptions.ConnectionError as error:
+    except aiohttp.ClientConnectionError as error:
         print(error, "Ошибка соединения")
     except Exception as error:
         print(error, "ERROR_2")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,43 +1,189 @@
-import io
+import asyncio
 import logging.config
-import os
 import re
+import tempfile
 import zipfile
+from functools import lru_cache
+from itertools import islice
 from environs import Env
 
-import pandas as pd
+import aiohttp
+import orjson
 import requests
+import xlrd
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 logger = logging.getLogger(__file__)
 
+# Общая сессия с keep-alive для скачивания остатков: соединение
+# переиспользуется вместо нового TCP+TLS рукопожатия на каждый запрос:
+session = requests.Session()
 
-def get_product_list(last_id, client_id, seller_token):
+# Номер строки с заголовками колонок в ostatki.xls (нумерация с нуля):
+HEADER_ROW = 17
+
+# Единственные колонки остатков, которые читают create_stocks/create_prices:
+REMNANT_COLUMNS = ("Код", "Количество", "Цена")
+
+# Скомпилирован один раз, а не на каждый вызов price_conversion:
+NOT_DIGITS_RE = re.compile("[^0-9]")
+
+# Общий потолок на запрос, чтобы зависший вызов не блокировал выгрузку:
+REQUEST_TIMEOUT = 60
+
+# Разобранные остатки вместе с валидаторами ответа (ETag/Last-Modified);
+# пока архив на сайте не изменился, повторный запуск обходится ответом 304:
+REMNANTS_CACHE_FILE = "ostatki_cache.json"
+
+
+def _load_remnants_cache():
+    """Loads the cached remnants and their HTTP validators from disk.
+
+    Returns:
+        dict: The cache contents — "etag", "last_modified" and
+            "watch_remnants" keys — or an empty dict when the cache file is
+            missing or unreadable.
+    """
+    try:
+        with open(REMNANTS_CACHE_FILE, "rb") as cache_file:
+            return orjson.loads(cache_file.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_remnants_cache(validators, watch_remnants):
+    """Stores the parsed remnants and their HTTP validators on disk.
+
+    Args:
+        validators (dict): The "etag" and "last_modified" values of the
+            response the remnants were parsed from.
+        watch_remnants (list): The parsed stock rows to cache.
+    """
+    cache = dict(validators)
+    cache["watch_remnants"] = watch_remnants
+    with open(REMNANTS_CACHE_FILE, "wb") as cache_file:
+        cache_file.write(orjson.dumps(cache))
+
+
+def _session(client_id, seller_token):
+    """Creates a shared aiohttp client session for the Ozon seller API.
+
+    The session keeps a pool of keep-alive connections to the API host, so
+    concurrent requests reuse already established TCP+TLS connections instead
+    of paying a full handshake per call. The authentication headers are set
+    once here and apply to every request made through the session, so the
+    per-call wrappers no longer rebuild them.
+
+    Args:
+        client_id (str): The unique client ID provided by Ozon.
+        seller_token (str): The seller's authorization token required to make API requests.
+
+    Returns:
+        aiohttp.ClientSession: A session configured for the Ozon seller API.
+
+    Example:
+        >>> async with _session("your_client_id", "your_seller_token") as session:
+        ...     products = await get_product_list("", session)
+    """
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=64, keepalive_timeout=75)
+    headers = {
+        "Client-Id": client_id,
+        "Api-Key": seller_token,
+    }
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+    )
+
+
+def _is_transient_error(error):
+    """Tells whether a request failure is worth retrying.
+
+    Only 429, 5xx and timeouts are transient; other 4xx responses (bad
+    payload, revoked token) will fail identically on every attempt and
+    should surface immediately instead of burning the retry budget.
+
+    Args:
+        error (BaseException): The exception raised by the request attempt.
+
+    Returns:
+        bool: True if the request should be retried.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, asyncio.TimeoutError)
+
+
+async def _request(session, method, url, decode=True, **kwargs):
+    """Sends a request to the Ozon API with timeouts and exponential-backoff retries.
+
+    Transient failures (429, 5xx, timeouts) no longer abort a whole upload:
+    the request is retried up to six times with jittered exponential back-off,
+    honoring the `Retry-After` header when the API asks to slow down. The
+    session-wide timeout bounds every attempt, so a hung call cannot block
+    the pipeline indefinitely.
+
+    Args:
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
+        method (str): The HTTP method of the request, e.g. "POST".
+        url (str): The full URL of the API endpoint.
+        decode (bool): Whether to decode and return the JSON response body.
+            Pass False for calls whose body is unused. Defaults to True.
+        **kwargs: Extra arguments passed to `session.request`, such as `json`.
+
+    Returns:
+        dict: The decoded JSON body of the successful response, or None when
+            `decode` is False.
+
+    Raises:
+        aiohttp.ClientResponseError: If the request still fails after all retry attempts.
+    """
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(6),
+        wait=wait_exponential_jitter(1, 30),
+        retry=retry_if_exception(_is_transient_error),
+        reraise=True,
+    ):
+        with attempt:
+            async with session.request(method, url, **kwargs) as response:
+                if response.status == 429:
+                    await asyncio.sleep(int(response.headers.get("Retry-After", "1")))
+                response.raise_for_status()
+                if decode:
+                    return await response.json(loads=orjson.loads)
+                return None
+
+
+async def get_product_list(last_id, session):
     """Get the list of products from the Ozon store.
 
     Sends a request to the Ozon API to retrieve a list of products from the store.
-    It uses the provided last product ID, client ID, and seller token for authentication and pagination.
+    It uses the provided last product ID for pagination; authentication comes
+    from the headers of the shared session.
 
     Args:
         last_id (str): The ID of the last product. Used for pagination.
-        client_id (str): The unique client ID provided by Ozon.
-        seller_token (str): The seller's authorization token required to make API requests.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         list: A list of products in the store, obtained from the API response.
               The returned list may be empty if there are no products.
 
     Example:
-        >>> get_product_list("12345", "your_client_id", "your_seller_token")
+        >>> await get_product_list("12345", session)
         [{'id': 1, 'name': 'Product 1'}, {'id': 2, 'name': 'Product 2'}]
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        aiohttp.ClientResponseError: If the API request fails.
     """
     url = "https://api-seller.ozon.ru/v2/product/list"
-    headers = {
-        "Client-Id": client_id,
-        "Api-Key": seller_token,
-    }
     payload = {
         "filter": {
             "visibility": "ALL",
@@ -45,60 +191,65 @@ def get_product_list(last_id, client_id, seller_token):
         "last_id": last_id,
         "limit": 1000,
     }
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    response_object = response.json()
+    response_object = await _request(session, "POST", url, json=payload)
     return response_object.get("result")
 
 
-def get_offer_ids(client_id, seller_token):
+async def get_offer_ids(session):
     """
     Retrieve the offer IDs of products from the Ozon store.
 
-    This function calls the `get_product_list` function in a loop to
+    This coroutine calls the `get_product_list` coroutine in a loop to
     obtain all products available in the store. It handles pagination
     by using the last_product_id obtained in each response. The
     retrieved products' offer IDs are then extracted and returned as a list.
 
     Args:
-        client_id (str): The unique client ID provided by Ozon.
-        seller_token (str): The seller's authorization token required
-                            to make API requests.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
         list: A list of offer IDs for all products in the store. The
               returned list may be empty if there are no products.
 
     Example:
-        >>> get_offer_ids("your_client_id", "your_seller_token")
+        >>> await get_offer_ids(session)
         ['offer_id_1', 'offer_id_2', ...]
 
     Raises:
         Exception: Raises an exception if there is an error during
                    product retrieval (e.g., API request fails).
     """
-    last_id = ""
-    product_list = []
-    while True:
-        some_prod = get_product_list(last_id, client_id, seller_token)
-        product_list.extend(some_prod.get("items"))
+    offer_ids = []
+    seen = 0
+    next_page = asyncio.ensure_future(get_product_list("", session))
+    while next_page is not None:
+        some_prod = await next_page
+        items = some_prod.get("items")
         total = some_prod.get("total")
         last_id = some_prod.get("last_id")
-        if total == len(product_list):
-            break
-    offer_ids = []
-    for product in product_list:
-        offer_ids.append(product.get("offer_id"))
+        seen += len(items)
+        # Курсор следующей страницы известен сразу, поэтому запрашиваем ее
+        # в фоне, пока разбираем текущую:
+        if total == seen:
+            next_page = None
+        else:
+            next_page = asyncio.ensure_future(get_product_list(last_id, session))
+            # Нулевой sleep отдает управление циклу событий: без него
+            # фоновая задача не стартует до следующего await:
+            await asyncio.sleep(0)
+        # Сразу достаем offer_id из страницы, не накапливая полные записи:
+        offer_ids.extend(product.get("offer_id") for product in items)
     return offer_ids
 
 
-def update_price(prices: list, client_id, seller_token):
+async def update_price(prices: list, session):
     """Update product prices in the Ozon marketplace.
 
     This function sends a request to update the prices of products provided in a list.
     It constructs an HTTP POST request to the Ozon API with the necessary headers
-    and a payload containing the new prices. If the operation is successful,
-    the function returns the API response as a dictionary.
+    and a payload containing the new prices. The response body is not decoded:
+    the callers only care whether the update succeeded, which the status code
+    already tells us.
 
     Args:
         prices (list): A list of product prices to be updated. Each element in the list
@@ -106,44 +257,35 @@ def update_price(prices: list, client_id, seller_token):
                        new price. Example:
                        [{"offer_id": "offer_id_1", "price": 1000},
                         {"offer_id": "offer_id_2", "price": 1500}].
-        client_id (str): A unique identifier for the client provided by Ozon.
-        seller_token (str): A seller authorization token required to make API requests.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
-        dict: The response from the Ozon API, containing the result of the price update
-              operation. It may include status information and potential errors.
+        None: The call either succeeds silently or raises.
 
     Raises:
-        requests.exceptions.HTTPError: Raises an exception if the API returns an error,
+        aiohttp.ClientResponseError: Raises an exception if the API returns an error,
                                         for example, in case of incorrect data or
                                         authorization issues.
 
     Example:
-        >>> update_price([
+        >>> await update_price([
             {"offer_id": "offer_id_1", "price": 1000},
             {"offer_id": "offer_id_2", "price": 1500}
-        ], "your_client_id", "your_seller_token")
-        {'status': 'success', 'updated_count': 2}
+        ], session)
     """
     url = "https://api-seller.ozon.ru/v1/product/import/prices"
-    headers = {
-        "Client-Id": client_id,
-        "Api-Key": seller_token,
-    }
     payload = {"prices": prices}
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    await _request(session, "POST", url, decode=False, json=payload)
 
 
-def update_stocks(stocks: list, client_id, seller_token):
+async def update_stocks(stocks: list, session):
     """
     Update product stocks in the Ozon marketplace.
 
     This function sends a request to update the stock quantities of products provided in a list.
     It constructs an HTTP POST request to the Ozon API with the necessary headers and a payload
-    containing the new stock information. If the operation is successful, the function returns
-    the API response as a dictionary.
+    containing the new stock information. The response body is not decoded: the callers only
+    care whether the update succeeded, which the status code already tells us.
 
     Args:
         stocks (list): A list of stock quantities to be updated. Each element in the list should
@@ -151,76 +293,157 @@ def update_stocks(stocks: list, client_id, seller_token):
                        level. Example:
                        [{"offer_id": "offer_id_1", "stock": 50},
                         {"offer_id": "offer_id_2", "stock": 100}].
-        client_id (str): A unique identifier for the client provided by Ozon.
-        seller_token (str): A seller authorization token required to make API requests.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
 
     Returns:
-        dict: The response from the Ozon API, containing the result of the stock update operation.
-              It may include status information and potential errors.
+        None: The call either succeeds silently or raises.
 
     Raises:
-        requests.exceptions.HTTPError: Raises an exception if the API returns an error,
+        aiohttp.ClientResponseError: Raises an exception if the API returns an error,
                                         for instance, in case of incorrect data or authorization issues.
 
     Example:
-        >>> update_stocks([
+        >>> await update_stocks([
         >>>     {"offer_id": "offer_id_1", "stock": 50},
         >>>     {"offer_id": "offer_id_2", "stock": 100}
-        >>> ], "your_client_id", "your_seller_token")
-        {'status': 'success', 'updated_count': 2}
+        >>> ], session)
     """
     url = "https://api-seller.ozon.ru/v1/product/import/stocks"
-    headers = {
-        "Client-Id": client_id,
-        "Api-Key": seller_token,
-    }
     payload = {"stocks": stocks}
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    await _request(session, "POST", url, decode=False, json=payload)
 
 
 def download_stock():
     """Download the stock file from the Casio website.
 
     This function downloads a zip archive containing stock data for watches from the specified URL.
-    After downloading, it unzips the archive and extracts the Excel file containing stock data.
-    The function converts the contents of the Excel file into a list of dictionaries representing the watch stocks,
-    and returns this list. The Excel file is deleted after processing to save space.
+    The request is conditional: the ETag/Last-Modified validators of the previous download are sent
+    along, and when the site answers 304 Not Modified the remnants parsed last time are returned
+    from the on-disk cache without downloading or parsing anything. Otherwise it reads the Excel
+    file with stock data straight out of the archive in memory — nothing is extracted to disk —
+    converts its contents into a list of dictionaries representing the watch stocks, caches them,
+    and returns this list.
 
     Returns:
         list: A list of dictionaries, each containing data about the watch stocks.
               The data is loaded from the file "ostatki.xls", which is downloaded from the
-              Casio website and processed using the pandas library.
+              Casio website and parsed row by row with the xlrd library.
 
     Raises:
         requests.exceptions.HTTPError: Raised if the request to download the file fails.
-        FileNotFoundError: Raised if the file "ostatki.xls" is not found after extraction.
+        KeyError: Raised if the file "ostatki.xls" is not present in the archive.
 
     Example:
         >>> watch_remnants = download_stock()
         >>> print(watch_remnants[0])
         {'model': 'Model 1', 'stock': 10, ... }
     """
-    # Скачать остатки с сайта
+    # Скачать остатки с сайта, не держа весь архив в памяти:
     casio_url = "https://timeworld.ru/upload/files/ostatki.zip"
-    session = requests.Session()
-    response = session.get(casio_url)
-    response.raise_for_status()
-    with response, zipfile.ZipFile(io.BytesIO(response.content)) as archive:
-        archive.extractall(".")
+    cache = _load_remnants_cache()
+    conditional_headers = {}
+    if cache.get("etag"):
+        conditional_headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        conditional_headers["If-Modified-Since"] = cache["last_modified"]
+    with tempfile.TemporaryFile() as zip_file:
+        with session.get(
+            casio_url,
+            stream=True,
+            timeout=REQUEST_TIMEOUT,
+            headers=conditional_headers,
+        ) as response:
+            if response.status_code == requests.codes.not_modified:
+                # Архив на сайте не менялся — берем разобранные остатки с диска:
+                return cache.get("watch_remnants")
+            response.raise_for_status()
+            validators = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+            for chunk in response.iter_content(chunk_size=65536):
+                zip_file.write(chunk)
+        with zipfile.ZipFile(zip_file) as archive:
+            excel_data = archive.read("ostatki.xls")
     # Создаем список остатков часов:
-    excel_file = "ostatki.xls"
-    watch_remnants = pd.read_excel(
-        io=excel_file,
-        na_values=None,
-        keep_default_na=False,
-        header=17,
-    ).to_dict(orient="records")
-    os.remove("./ostatki.xls")  # Удалить файл
+    watch_remnants = _parse_remnants(excel_data)
+    if validators["etag"] or validators["last_modified"]:
+        _store_remnants_cache(validators, watch_remnants)
     return watch_remnants
 
 
+def _cell_value(cell):
+    """Returns the value of an xlrd cell, narrowing integral floats back to int.
+
+    xlrd reports every numeric cell as float, so product codes would
+    stringify with a trailing ".0" without this.
+
+    Args:
+        cell (xlrd.sheet.Cell): The cell to read.
+
+    Returns:
+        The cell value; empty cells come through as empty strings.
+    """
+    if cell.ctype == xlrd.XL_CELL_NUMBER and cell.value == int(cell.value):
+        return int(cell.value)
+    return cell.value
+
+
+def _parse_remnants(excel_data):
+    """Parses the remnants workbook into a list of row dictionaries.
+
+    Drives xlrd (the engine pandas itself delegates legacy .xls files to)
+    directly in on_demand mode instead of materializing a DataFrame first.
+    Only the columns listed in `REMNANT_COLUMNS` are extracted — their
+    positions are resolved against the header row once, and each stock row
+    becomes a three-key dict instead of carrying every workbook column.
+    Empty cells stay empty strings, matching the old keep_default_na=False
+    behavior. Should the workbook layout change and a column go missing,
+    full rows keyed by the header are returned as before.
+
+    Args:
+        excel_data (bytes): The raw contents of the "ostatki.xls" workbook.
+
+    Returns:
+        list: A list of dictionaries, one per stock row.
+    """
+    book = xlrd.open_workbook(file_contents=excel_data, on_demand=True)
+    sheet = book.sheet_by_index(0)
+    header = [str(cell.value) for cell in sheet.row(HEADER_ROW)]
+    try:
+        columns = [(name, header.index(name)) for name in REMNANT_COLUMNS]
+    except ValueError:
+        # Неожиданный формат файла — оставляем строки целиком:
+        return [
+            dict(zip(header, (_cell_value(cell) for cell in sheet.row(row_index))))
+            for row_index in range(HEADER_ROW + 1, sheet.nrows)
+        ]
+    return [
+        {name: _cell_value(sheet.cell(row_index, col)) for name, col in columns}
+        for row_index in range(HEADER_ROW + 1, sheet.nrows)
+    ]
+
+
+def _index_remnants(watch_remnants):
+    """Indexes watch remnants by their stringified product code.
+
+    Both `create_stocks` and `create_prices` key their lookups on the product
+    code as a string; building the index here keeps the str() conversion to
+    one per row and the logic in one place. For duplicate codes the first
+    row wins, matching the original scan order.
+
+    Args:
+        watch_remnants (list): A list of dictionaries containing product information.
+
+    Returns:
+        dict: A mapping from stringified product code to its remnant dictionary.
+    """
+    index = {}
+    for watch in watch_remnants:
+        index.setdefault(str(watch.get("Код")), watch)
+    return index
+
+
 def create_stocks(watch_remnants, offer_ids):
     """Create a list of stock information for given offer IDs based on available watch remnants.
 
@@ -245,22 +468,24 @@ def create_stocks(watch_remnants, offer_ids):
         >>> print(stocks)
         [{'offer_id': '123', 'stock': 5}, {'offer_id': '456', 'stock': 100}, {'offer_id': '789', 'stock': 0}]
     """
-    # Уберем то, что не загружено в seller
+    # Индекс остатков по коду дает один O(N) проход по offer_ids
+    # вместо поиска и удаления в списке на каждой строке:
+    remnants = _index_remnants(watch_remnants)
     stocks = []
-    for watch in watch_remnants:
-        if str(watch.get("Код")) in offer_ids:
-            count = str(watch.get("Количество"))
-            if count == ">10":
-                stock = 100
-            elif count == "1":
-                stock = 0
-            else:
-                stock = int(watch.get("Количество"))
-            stocks.append({"offer_id": str(watch.get("Код")), "stock": stock})
-            offer_ids.remove(str(watch.get("Код")))
-    # Добавим недостающее из загруженного:
     for offer_id in offer_ids:
-        stocks.append({"offer_id": offer_id, "stock": 0})
+        watch = remnants.get(offer_id)
+        if watch is None:
+            # Недостающее из загруженного в seller:
+            stocks.append({"offer_id": offer_id, "stock": 0})
+            continue
+        count = str(watch.get("Количество"))
+        if count == ">10":
+            stock = 100
+        elif count == "1":
+            stock = 0
+        else:
+            stock = int(count)
+        stocks.append({"offer_id": offer_id, "stock": stock})
     return stocks
 
 
@@ -290,13 +515,17 @@ def create_prices(watch_remnants, offer_ids):
         [{'auto_action_enabled': 'UNKNOWN', 'currency_code': 'RUB', 'offer_id': '123', 'old_price': '0', 'price': 1500},
             {'auto_action_enabled': 'UNKNOWN', 'currency_code': 'RUB', 'offer_id': '456', 'old_price': '0', 'price': 2000}]
     """
+    # Индекс остатков по коду дает один O(N) проход по offer_ids
+    # вместо проверки принадлежности на каждой строке:
+    remnants = _index_remnants(watch_remnants)
     prices = []
-    for watch in watch_remnants:
-        if str(watch.get("Код")) in offer_ids:
+    for offer_id in offer_ids:
+        watch = remnants.get(offer_id)
+        if watch is not None:
             price = {
                 "auto_action_enabled": "UNKNOWN",
                 "currency_code": "RUB",
-                "offer_id": str(watch.get("Код")),
+                "offer_id": offer_id,
                 "old_price": "0",
                 "price": price_conversion(watch.get("Цена")),
             }
@@ -304,10 +533,14 @@ def create_prices(watch_remnants, offer_ids):
     return prices
 
 
+@lru_cache(maxsize=None)
 def price_conversion(price: str) -> str:
     """
     Converts a price string to a numeric string by removing non-numeric characters.
 
+    The result is memoized: catalogs repeat the same price strings heavily and
+    the conversion is re-run per campaign, so identical inputs are only parsed once.
+
     Args:
         price (str): The price in string format, which may include currency symbols, commas, and decimal points.
 
@@ -322,20 +555,22 @@ def price_conversion(price: str) -> str:
         >>> price_conversion("abc123")
         '123'
     """
-    return re.sub("[^0-9]", "", price.split(".")[0])
+    return NOT_DIGITS_RE.sub("", price.split(".")[0])
 
 
-def divide(lst: list, n: int):
-    """Splits the list into chunks of n elements.
+def divide(lst, n: int):
+    """Splits an iterable into chunks of n elements.
 
-    This function takes a list and divides it into sublists of fixed length.
+    This function consumes the iterable through a single shared iterator and
+    slices it with `itertools.islice`, so chunking works on generators as well
+    as lists and never re-copies ranges of the source via slicing.
 
     Arguments:
-        lst (list): The list to be divided.
-        n (int): The number of elements in each sublist.
+        lst (iterable): The iterable to be divided.
+        n (int): The number of elements in each chunk.
 
     Returns:
-        generator: A generator that yields sublists of length n.
+        generator: A generator that yields chunks of length n.
 
     Example:
         >>> result = list(divide([1, 2, 3, 4, 5, 6], 2))
@@ -343,60 +578,76 @@ def divide(lst: list, n: int):
         [[1, 2], [3, 4], [5, 6]]
 
     Note:
-        If the length of the list is not divisible by n, the last sublist may contain fewer than n elements.
+        If the length of the iterable is not divisible by n, the last chunk may contain fewer than n elements.
     """
-    for i in range(0, len(lst), n):
-        yield lst[i : i + n]
+    iterator = iter(lst)
+    while True:
+        chunk = list(islice(iterator, n))
+        if not chunk:
+            return
+        yield chunk
 
 
-async def upload_prices(watch_remnants, client_id, seller_token):
+async def upload_prices(watch_remnants, session, offer_ids=None):
     """Uploads product prices to the Ozon platform.
 
-    This function retrieves offer IDs from the Ozon API, creates a list of prices
-    based on the provided watch remnants, and uploads the prices in batches of 1000.
+    This function creates a list of prices based on the provided watch remnants
+    and uploads the prices in batches of 1000. The batches are independent and
+    are sent concurrently over the pooled connections of the shared session.
+    The offer IDs can be passed in by the caller to avoid repeating the
+    paginated product scan; when omitted they are fetched here.
 
     Args:
         watch_remnants (list): A list of dictionaries containing watch remnants
             with their corresponding codes and prices.
-        client_id (str): The client ID for authenticating with the Ozon API.
-        seller_token (str): The seller token for authenticating with the Ozon API.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
+        offer_ids (list, optional): The offer IDs already fetched for this store.
+            Defaults to None, in which case they are fetched via `get_offer_ids`.
 
     Returns:
         list: A list of price dictionaries that were successfully uploaded.
 
     Example:
         >>> watch_remnants = [{'Код': '123', 'Цена': '5\'990.00 руб.'}, ...]
-        >>> client_id = 'your_client_id'
-        >>> seller_token = 'your_seller_token'
-        >>> prices = await upload_prices(watch_remnants, client_id, seller_token)
+        >>> prices = await upload_prices(watch_remnants, session)
         >>> print(prices)
         [{'auto_action_enabled': 'UNKNOWN', 'currency_code': 'RUB', 'offer_id': '123', 'old_price': '0', 'price': '5990'}, ...]
 
     Raises:
-        requests.exceptions.ReadTimeout: If the request to the Ozon API times out.
-        requests.exceptions.ConnectionError: If there is a connection error while
+        asyncio.TimeoutError: If the request to the Ozon API times out.
+        aiohttp.ClientConnectionError: If there is a connection error while
             trying to reach the Ozon API.
         Exception: For any other exceptions that may occur during execution.
     """
-    offer_ids = get_offer_ids(client_id, seller_token)
+    if offer_ids is None:
+        offer_ids = await get_offer_ids(session)
     prices = create_prices(watch_remnants, offer_ids)
-    for some_price in list(divide(prices, 1000)):
-        update_price(some_price, client_id, seller_token)
+    # Пакеты не зависят друг от друга — отправляем их параллельно:
+    await asyncio.gather(
+        *(
+            update_price(some_price, session)
+            for some_price in divide(prices, 1000)
+        )
+    )
     return prices
 
 
-async def upload_stocks(watch_remnants, client_id, seller_token):
+async def upload_stocks(watch_remnants, session, offer_ids=None):
     """
     Uploads product stocks to the Ozon platform.
 
-    This function retrieves offer IDs from the Ozon API, creates a list of stocks
-    based on the provided watch remnants, and uploads the stocks in batches of 100.
+    This function creates a list of stocks based on the provided watch remnants
+    and uploads the stocks in batches of 100. The batches are independent and
+    are sent concurrently over the pooled connections of the shared session.
+    The offer IDs can be passed in by the caller to avoid repeating the
+    paginated product scan; when omitted they are fetched here.
 
     Args:
         watch_remnants (list): A list of dictionaries containing watch remnants
                                 with their corresponding codes and stock quantities.
-        client_id (str): The client ID for authenticating with the Ozon API.
-        seller_token (str): The seller token for authenticating with the Ozon API.
+        session (aiohttp.ClientSession): The shared client session created by `_session`.
+        offer_ids (list, optional): The offer IDs already fetched for this store.
+            Defaults to None, in which case they are fetched via `get_offer_ids`.
 
     Returns:
         tuple: A tuple containing two lists:
@@ -405,48 +656,51 @@ async def upload_stocks(watch_remnants, client_id, seller_token):
 
     Example:
         >>> watch_remnants = [{'Код': '123', 'Остаток': 10}, ...]
-        >>> client_id = 'your_client_id'
-        >>> seller_token = 'your_seller_token'
-        >>> not_empty, all_stocks = await upload_stocks(watch_remnants, client_id, seller_token)
+        >>> not_empty, all_stocks = await upload_stocks(watch_remnants, session)
         >>> print(not_empty)
         [{'offer_id': '123', 'stock': 10}, ...]
 
     Raises:
-        requests.exceptions.ReadTimeout: If the request to the Ozon API times out.
-        requests.exceptions.ConnectionError: If there is a connection error while
+        asyncio.TimeoutError: If the request to the Ozon API times out.
+        aiohttp.ClientConnectionError: If there is a connection error while
                                                 trying to reach the Ozon API.
         Exception: For any other exceptions that may occur during execution.
     """
-    offer_ids = get_offer_ids(client_id, seller_token)
+    if offer_ids is None:
+        offer_ids = await get_offer_ids(session)
     stocks = create_stocks(watch_remnants, offer_ids)
-    for some_stock in list(divide(stocks, 100)):
-        update_stocks(some_stock, client_id, seller_token)
-    not_empty = list(filter(lambda stock: (stock.get("stock") != 0), stocks))
+    # Пакеты не зависят друг от друга — отправляем их параллельно:
+    await asyncio.gather(
+        *(
+            update_stocks(some_stock, session)
+            for some_stock in divide(stocks, 100)
+        )
+    )
+    not_empty = [stock for stock in stocks if stock.get("stock") != 0]
     return not_empty, stocks
 
 
-def main():
+async def main():
     env = Env()
     seller_token = env.str("SELLER_TOKEN")
     client_id = env.str("CLIENT_ID")
     try:
-        offer_ids = get_offer_ids(client_id, seller_token)
-        watch_remnants = download_stock()
-        # Обновить остатки
-        stocks = create_stocks(watch_remnants, offer_ids)
-        for some_stock in list(divide(stocks, 100)):
-            update_stocks(some_stock, client_id, seller_token)
-        # Поменять цены
-        prices = create_prices(watch_remnants, offer_ids)
-        for some_price in list(divide(prices, 900)):
-            update_price(some_price, client_id, seller_token)
-    except requests.exceptions.ReadTimeout:
+        async with _session(client_id, seller_token) as client:
+            offer_ids = await get_offer_ids(client)
+            watch_remnants = download_stock()
+            # Остатки и цены не зависят друг от друга — обновляем параллельно,
+            # передавая уже полученные offer_ids в обе выгрузки:
+            await asyncio.gather(
+                upload_stocks(watch_remnants, client, offer_ids),
+                upload_prices(watch_remnants, client, offer_ids),
+            )
+    except (requests.exceptions.ReadTimeout, asyncio.TimeoutError):
         print("Превышено время ожидания...")
-    except requests.exceptions.ConnectionError as error:
+    except (requests.exceptions.ConnectionError, aiohttp.ClientConnectionError) as error:
         print(error, "Ошибка соединения")
     except Exception as error:
         print(error, "ERROR_2")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())